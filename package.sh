@@ -14,11 +14,11 @@ fi
 
 rm -rf dist
 
-cp setup.py setup-original.py
-sed "s/version = '.*'/version = '$version'/" \
-    < setup-original.py \
-    > setup.py
+cp pyproject.toml pyproject-original.toml
+sed "s/^version = \".*\"/version = \"$version\"/" \
+    < pyproject-original.toml \
+    > pyproject.toml
 python setup.py sdist
-mv setup-original.py setup.py
+mv pyproject-original.toml pyproject.toml
 
 rm -rf rozipinfo.egg-info
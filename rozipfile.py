@@ -28,10 +28,6 @@ import zipfile
 import rozipinfo
 
 
-# Whether the Python zipfile module supports compression levels.
-has_compression_level = sys.version_info > (3, 7)
-
-
 class RISCOSZipFileError(Exception):
     pass
 
@@ -95,7 +91,15 @@ class RISCOSZipFile(object):
     inv_named_types = dict((name.lower(), filetype) for filetype, name in named_types.items())
     cls_zipinfo = rozipinfo.ZipInfoRISCOS
 
-    escapable_re = re.compile(br'[\x00-\x1f\x7f-\xff]')
+    escapable_re = re.compile(br'[\x00-\x1f\x7f-\xff\\]')
+    # Escaped form of each byte matched by escapable_re
+    escapable_replacements = dict((bytes((c,)), b'\\x%02x' % (c,))
+                                  for c in list(range(0x00, 0x20)) + list(range(0x7f, 0x100)))
+    escapable_replacements[b'\\'] = b'\\\\'
+    # Quoted names must also escape the quote character
+    escapable_quoted_re = re.compile(br"[\x00-\x1f\x7f-\xff\\']")
+    escapable_quoted_replacements = dict(escapable_replacements)
+    escapable_quoted_replacements[b"'"] = b"\\'"
 
     def __init__(self, zip_filename, mode='r', compression=zipfile.ZIP_STORED,
                  base_dir='.', default_filetype=None):
@@ -167,7 +171,7 @@ class RISCOSZipFile(object):
         with open(filename, 'rb') as fh:
             data = fh.read()
         #print("Compression: %r"% (compresslevel,))
-        if compresslevel is None or not has_compression_level:
+        if compresslevel is None:
             self.zh.writestr(zi, data)
         else:
             self.zh.writestr(zi, data, compresslevel=compresslevel)
@@ -304,8 +308,6 @@ class RISCOSZipFile(object):
         """
         Presentation format for the Unicode native filenames, in verbose output
         """
-        if sys.version_info.major == 2:
-            name = name.encode('utf-8')
         if quoted:
             value = "'" + name.replace("'", "\\'") + "'"
         return value
@@ -314,24 +316,18 @@ class RISCOSZipFile(object):
         """
         Presentation format for the RISC OS filenames, used in verbose output
         """
-        name = name.replace(b'\\', b'\\\\')
-        value = self.escapable_re.sub(lambda s: b'\\x%02x' % (ord(s.group(0))), name)
-
-        if sys.version_info.major != 2:
-            value = value.decode('ascii')
         if quoted:
-            return "'" + value.replace("'", "\\'") + "'"
-        return value
+            replacements = self.escapable_quoted_replacements
+            value = self.escapable_quoted_re.sub(lambda s: replacements[s.group(0)], name)
+            return "'" + value.decode('ascii') + "'"
+        replacements = self.escapable_replacements
+        return self.escapable_re.sub(lambda s: replacements[s.group(0)], name).decode('ascii')
 
     def _listing_riscos_name(self, zi):
         """
         Name for the listing of the RISC OS name.
         """
-        if sys.version_info.major == 2:
-            value = zi.riscos_filename.decode(zi.filename_encoding_name).encode('utf-8')
-        else:
-            value = zi.riscos_filename.decode(zi.filename_encoding_name)
-        return value
+        return zi.riscos_filename.decode(zi.filename_encoding_name)
 
     def printdir(self):
         """
@@ -364,8 +360,6 @@ class RISCOSZipFile(object):
                     loadexec_datetime = self._describe_datetime(zi.riscos_date_time)
                 name = zi.riscos_filename.decode(zi.filename_encoding_name)
                 padding = ' ' * (longest_name - len(name))
-                if sys.version_info.major == 2:
-                    name = name.encode('utf-8')
                 print("{}{} {:9} {:<10} {:>20} {}".format(name, padding,
                                                           self._describe_attributes(zi.riscos_attr, zi.riscos_objtype),
                                                           self._describe_filetype(zi.riscos_filetype, zi.riscos_objtype),
@@ -454,14 +448,12 @@ def main():
     parser = argparse.ArgumentParser()
     parser.add_argument('-0', '--store',      dest='compression', action='store_const', const=0, default=6,
                         help="Compression level: Store")
-    if has_compression_level:
-        parser.add_argument('-1', '--faster', dest='compression', action='store_const', const=1,
-                            help="Compression level: Deflate level 1 (faster)")
+    parser.add_argument('-1', '--faster',     dest='compression', action='store_const', const=1,
+                        help="Compression level: Deflate level 1 (faster)")
     parser.add_argument('-6', '--deflate',    dest='compression', action='store_const', const=6,
                         help="Compression level: Deflate level 6 (default)")
-    if has_compression_level:
-        parser.add_argument('-9', '--better', dest='compression', action='store_const', const=9,
-                            help="Compression level: Deflate level 9 (best)")
+    parser.add_argument('-9', '--better',     dest='compression', action='store_const', const=9,
+                        help="Compression level: Deflate level 9 (best)")
     parser.add_argument('-v', '--verbose', action='store_true',
                         help="Output more information during processing")
     parser.add_argument('-T', '--default-filetype', default=None,
@@ -19,7 +19,7 @@ object, with the following extensions:
       the base properties.
       * `riscos_filename` is the RISC OS filename. It will be in a form for
         use within RISC OS, encoded using `filename_encoding_name` as the
-        encoding. It a bytes (str on Python 2) object, whilst `filename` is
+        encoding. It a bytes object, whilst `filename` is
         always a unicode object.
       * `riscos_date_time` contains the Load and Exec timestamps when present,
         or it will be taken from the base `date_time` if no Load and Exec was
@@ -85,34 +85,19 @@ necessary.
 import datetime
 import os
 import re
-import stat
 import struct
 import sys
 import time
 import zipfile
 
 
-try:
-    # Python 3: maketrans is a member of str
-    maketrans = bytes.maketrans
-
-except AttributeError:
-    # Python 2: maketrans is a member of string
-    import string
-    maketrans = string.maketrans
-
-
-try:
-    unicode
-
-except NameError:
-    # Python 3, make unicode the str type
-    unicode = str
-
-
 unix_epoch_to_riscos_epoch = int(int(70*365.25) * 24*60*60)
 datetime_epochtime = datetime.datetime(1970, 1, 1, tzinfo=None)
 
+# Object type bits within the stat mode, so that directories can be identified without a call
+stat_mode_type_mask = 0o170000
+stat_mode_directory = 0o040000
+
 
 def quin_to_epochtime(quin):
     if not quin:
@@ -239,8 +224,14 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
     # The characters acceptable to the NFS encoding
     nfs_encoding_hexdigits = '0123456789abcdef'
 
-    # Translation for the string
-    exchange_dot_slash = maketrans(b'/.', b'./')
+    # Translation table exchanging the '.' and '/' characters; built once with the class
+    # and shared by unix_to_riscos() and riscos_to_unix().
+    exchange_dot_slash = bytes.maketrans(b'/.', b'./')
+
+    # Single byte substitutions to make RISC OS names safe
+    sanitise_riscos_translate = bytes.maketrans(b'<>"', b"()'")
+    # Characters which may need to be made safe in RISC OS names (excluding the '.' separator)
+    sanitise_riscos_specials = b'<>"*?:#$@%\\&^'
 
     # Path safety
     sanitise_unix_relative_re = re.compile(br'[^/]+/\.\.(/|$)')
@@ -296,19 +287,22 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
     _riscos_attr_public_write = (1<<5)
     _riscos_attr_public_locked = (1<<6)
 
-    _riscos_filename = None
-    _riscos_date_time = None
-    _riscos_objtype = None
-    _riscos_loadaddr = None
-    _riscos_execaddr = None
-    _riscos_filetype = None
-    _riscos_attr = None
-    _riscos_present = False
-
-    _nfs_encoding = False
-
-    _extra = None
-    _filename = ''
+    # The per-object state is held in slots, like the base ZipInfo, to keep the objects small
+    # for archives with many members.
+    __slots__ = (
+            '_riscos_filename',
+            '_riscos_date_time',
+            '_riscos_objtype',
+            '_riscos_loadaddr',
+            '_riscos_execaddr',
+            '_riscos_filetype',
+            '_riscos_attr',
+            '_riscos_present',
+            '_nfs_encoding',
+            '_nfs_encoding_cache',
+            '_extra',
+            '_filename',
+        )
 
     def __init__(self, filename="NoName", date_time=(1980, 1, 1, 0, 0, 0),
                  zipinfo=None, nfs_encoding=True, zipinfo_fromzip=True):
@@ -325,65 +319,52 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
                                 If set to False, the ZipInfo was created manually and
                                 contains filenames in unicode format.
         """
+        self._riscos_filename = None
+        self._riscos_date_time = None
+        self._riscos_objtype = None
+        self._riscos_loadaddr = None
+        self._riscos_execaddr = None
+        self._riscos_filetype = None
+        self._riscos_attr = None
+        self._riscos_present = False
+        self._nfs_encoding = False
+        self._nfs_encoding_cache = None
+        self._extra = None
+        self._filename = ''
+
         super(ZipInfoRISCOS, self).__init__(filename, date_time)
         if zipinfo:
-            # In Python 2:
-            #   The filename in a ZipInfo created from the file on disc is in the form
-            #   of a raw bytes string which came from the zip archive, unless the
-            #   UTF-8 flag is set. Names that came from disc (in native format) will
-            #   need to be decoded using the zipfilename_encoding_name.
+            # The filename in a ZipInfo created from the file on disc has been decoded
+            # as if it was 'cp437', unless the UTF-8 flag is set. Names that came from
+            # disc in this format will need to be explicitly converted back to the
+            # form that was on disc (we assume that the conversion to 'cp437' is
+            # lossless), then decoded as the zipfilename_encoding_name.
             #
-            #   If the ZipInfo was created manually, it may be in an undetermined
-            #   encoding as a str, or prepared unicode. If it's a string, it probably
-            #   came from the filesystem, so we'll assume that it's UTF-8.
-            #
-            # In Python 3:
-            #   The filename in a ZipInfo created from the file on disc has been decoded
-            #   as if it was 'cp437', unless the UTF-8 flag is set. Names that came from
-            #   disc in this format will need to be explicitly converted back to the
-            #   form that was on disc (we assume that the conversion to 'cp437' is
-            #   lossless), then decoded as the zipfilename_encoding_name.
-            #
-            #   If the ZipInfo was created manually, it should always be a unicode so
-            #   we should trust and not decode from 'cp437'. HOWEVER, it is not possible
-            #   to know that the ZipInfo was created manually from the structure, so
-            #   the variable zipinfo_fromzip should be False in such cases. Most uses
-            #   will be to decode from a zip, so this defaults to True.
-            #
-            if sys.version_info.major == 2:
-                if zipinfo.flag_bits & self.generalflags_utf8:
-                    # The filename is already in unicode, so nothing to do.
-                    self.filename = zipinfo.filename
-                else:
-                    if isinstance(zipinfo.filename, unicode):
-                        # They supplied it already in unicode format. Nothing to do.
-                        self.filename = zipinfo.filename
-                    elif zipinfo_fromzip:
-                        # The filename is raw from the file, so we need to decode it
-                        self.filename = zipinfo.filename.decode(self.zipfilename_encoding_name, 'replace')
-                    else:
-                        # They created it manually, so assume it's UTF-8
-                        self.filename = zipinfo.filename.decode('utf-8', 'replace')
+            # If the ZipInfo was created manually, it should always be a unicode so
+            # we should trust and not decode from 'cp437'. HOWEVER, it is not possible
+            # to know that the ZipInfo was created manually from the structure, so
+            # the variable zipinfo_fromzip should be False in such cases. Most uses
+            # will be to decode from a zip, so this defaults to True.
+            if zipinfo.flag_bits & self.generalflags_utf8:
+                # The filename is already in unicode, so nothing to do.
+                self.filename = zipinfo.filename
             else:
-                if zipinfo.flag_bits & self.generalflags_utf8:
-                    # The filename is already in unicode, so nothing to do.
-                    self.filename = zipinfo.filename
+                if zipinfo_fromzip:
+                    # The filename has been decoded as cp437 so we need to restore
+                    # and redecode it.
+                    filename = zipinfo.filename.encode('cp437')
+                    self.filename = filename.decode(self.zipfilename_encoding_name, 'replace')
                 else:
-                    if zipinfo_fromzip:
-                        # The filename has been decoded as cp437 so we need to restore
-                        # and redecode it.
-                        filename = zipinfo.filename.encode('cp437')
-                        self.filename = filename.decode(self.zipfilename_encoding_name, 'replace')
-                    else:
-                        # This was a manually constructed ZipInfo so the filename is
-                        # already in unicode correctly.
-                        self.filename = zipinfo.filename
+                    # This was a manually constructed ZipInfo so the filename is
+                    # already in unicode correctly.
+                    self.filename = zipinfo.filename
 
             # They wanted to pre-populate from an existing ZipInfo object.
-            # Use the __slots__ element because this gives all the fields it supports.
+            # Use the base ZipInfo __slots__ element because this gives all the fields it
+            # supports (our own slots would only give the RISC OS state).
             # If the implementation changes, more consideration to reading the source
             # object will be required.
-            for field in zipinfo.__class__.__slots__:
+            for field in zipfile.ZipInfo.__slots__:
                 if field != 'extra' and field != 'filename':
                     setattr(self, field, getattr(zipinfo, field, None))
             # Always populate the extra field last, as this modifies the existing fields
@@ -442,9 +423,6 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         """
         The filename will always be in unicode format.
         """
-        if unicode is not str:
-            if isinstance(value, str):
-                value = value.decode(self.filename_encoding_name, 'replace')
         self._filename = value
         return value
 
@@ -628,16 +606,18 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
 
         @return:    file type if known, or None if nothing known about this filename
         """
-        if '.' in self.filename:
-            _, ext = self.filename.rsplit('.', 1)
+        filename = self.filename
+
+        # The mappings are keyed by the final extension, so this is a single lookup.
+        (_, dot, ext) = filename.rpartition('.')
+        if dot:
             filetype = self.filetype_extension_mappings.get(ext.lower(), None)
             if filetype is not None:
                 return filetype
 
-        if '/' in self.filename:
-            dirname, _ = self.filename.rsplit('/', 1)
-            if '/' in dirname:
-                _, dirname = dirname.rsplit('/', 1)
+        (dirname, slash, _) = filename.rpartition('/')
+        if slash:
+            dirname = dirname.rpartition('/')[2]
             filetype = self.filetype_parentdir_mappings.get(dirname.lower())
             if filetype is not None:
                 return filetype
@@ -684,6 +664,25 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
 
         return (name, loadaddr, execaddr, filetype)
 
+    def _extract_filename_nfs_encoding(self):
+        """
+        Extract the NFS encoding from our filename, caching the result.
+
+        The cache is keyed on the filename object itself. Strings are immutable, so the
+        result remains valid for as long as that filename is in use, and assigning a new
+        filename will not match the cached entry.
+
+        @return: tuple of (unix-filename stripped of suffix, load, exec, filetype)
+        """
+        filename = self.filename
+        cache = self._nfs_encoding_cache
+        if cache is not None and cache[0] is filename:
+            return cache[1]
+
+        result = self.extract_nfs_encoding(filename)
+        self._nfs_encoding_cache = (filename, result)
+        return result
+
     @classmethod
     def build_nfs_encoding(cls, name, loadaddr=None, execaddr=None, filetype=None):
         """
@@ -864,8 +863,16 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         @return: Safe name to use for RISC OS
         """
 
-        # Make any attempt to inject system variables safe
-        name = name.replace(b'<', b'(').replace(b'>', b')')
+        # Most names contain nothing which needs to be made safe, so these can be returned
+        # directly after a single scan for the special characters.
+        if len(name.translate(None, cls.sanitise_riscos_specials)) == len(name) and \
+           not name.startswith(b'.') and not name.endswith(b'.'):
+            return name
+
+        # Make any attempt to inject system variables safe, and replace the quotes which
+        # aren't allowed in filenames either. These are single byte substitutions, so are
+        # made in a single pass.
+        name = name.translate(cls.sanitise_riscos_translate)
 
         # Remove any initial anchors
         while name.startswith((b'$.', b'@.', b'%.', b'\\.', b'&.', b'^.')):
@@ -882,9 +889,6 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         # Prevent disc naming
         name = name.replace(b':', b'--')
 
-        # Quotes aren't allowed in filenames either
-        name = name.replace(b'"', b"'")
-
         # Prevent special field naming (may be overzealous here?)
         name = name.replace(b'#', b'(h)')
 
@@ -907,7 +911,7 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
     def nfs_encoding(self, value):
         changed = self._nfs_encoding != bool(value)
         if changed:
-            (name, loadaddr, execaddr, filetype) = self.extract_nfs_encoding(self.filename)
+            (name, loadaddr, execaddr, filetype) = self._extract_filename_nfs_encoding()
             self._nfs_encoding = bool(value)
             if not self._nfs_encoding:
                 # We have a unix name, so we can now explicitly clear the RISC OS filename to use that.
@@ -934,16 +938,10 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
 
         if self.nfs_encoding:
             # Convert filename to RISC OS format
-            (name, loadaddr, execaddr, filetype) = self.extract_nfs_encoding(self.filename)
+            (name, loadaddr, execaddr, filetype) = self._extract_filename_nfs_encoding()
             # We don't care about those types here; just that the name has been extracted.
         else:
             name = self.filename
-            # WARNING:
-            # In Python 2 the filename is a unicode if the UTF-8 flag was set, and a str if not.
-            # In Python 3 the filename is always a unicode.
-            if not isinstance(name, unicode):
-                # Decode from cp437 to match zipfile's handling in Python 3.
-                name = name.decode('cp437')
 
         # The filename is in unicode format for self.filename.
         # RISC OS filename should be in the RISC OS locale, so first we need to encode the
@@ -1015,23 +1013,23 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
     @property
     def riscos_loadaddr(self):
         # Convert time/filetype to RISC OS format
-        if self._riscos_loadaddr is not None:
+        loadaddr = self._riscos_loadaddr
+        if loadaddr is not None:
             # Load address exists.
-            if (self._riscos_loadaddr & 0xFFF00000) == 0xFFF00000 and self.riscos_filetype is not None:
-                # Can replace into the current load address
-                if self.riscos_filetype == self.directory_filetype:
-                    loadaddr = (self._riscos_loadaddr & 0xFFF000FF) | (self.directory_filetype_internal << 8)
-                else:
-                    loadaddr = (self._riscos_loadaddr & 0xFFF000FF) | (self.riscos_filetype << 8)
-                return loadaddr
-            else:
-                return self._riscos_loadaddr
+            if (loadaddr & 0xFFF00000) == 0xFFF00000:
+                filetype = self.riscos_filetype
+                if filetype is not None:
+                    # Can replace into the current load address
+                    if filetype == self.directory_filetype:
+                        filetype = self.directory_filetype_internal
+                    loadaddr = (loadaddr & 0xFFF000FF) | (filetype << 8)
+            return loadaddr
 
         if self.riscos_objtype == 1:
             # No load address given explicitly, so try to extract from NFS naming
             if self.nfs_encoding:
                 # Convert filename to RISC OS format
-                (name, loadaddr, execaddr, filetype) = self.extract_nfs_encoding(self.filename)
+                (name, loadaddr, execaddr, filetype) = self._extract_filename_nfs_encoding()
                 if loadaddr is not None:
                     return loadaddr
 
@@ -1060,7 +1058,7 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         # No exec address given explicitly, so try to extract from NFS naming
         if self.nfs_encoding:
             # Convert filename to RISC OS format
-            (name, loadaddr, execaddr, filetype) = self.extract_nfs_encoding(self.filename)
+            (name, loadaddr, execaddr, filetype) = self._extract_filename_nfs_encoding()
             if execaddr is not None:
                 return execaddr
 
@@ -1151,7 +1149,7 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         # No filetype currently set, so we'll infer one.
         if self.nfs_encoding:
             # Convert filename to RISC OS format
-            (name, loadaddr, execaddr, filetype) = self.extract_nfs_encoding(self.filename)
+            (name, loadaddr, execaddr, filetype) = self._extract_filename_nfs_encoding()
             if filetype is not None:
                 return filetype
             if loadaddr is not None:
@@ -1168,8 +1166,8 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
                 return (self._riscos_loadaddr >> 8) & 0xFFF
 
         # Call out to MimeMap to get the correct filetype for the name.
-        if '.' in self.filename:
-            _, ext = self.filename.rsplit('.', 1)
+        (_, dot, ext) = self.filename.rpartition('.')
+        if dot:
             filetype = self.filetype_from_extension(ext)
             if filetype:
                 return filetype
@@ -1200,10 +1198,10 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
             # The load address is set, so we need to override it.
             if (self._riscos_loadaddr & 0xFFF00000) != 0xFFF00000:
                 # It contains a type, so we need to replace it.
+                loadaddr_filetype = filetype
                 if filetype == self.directory_filetype:
-                    self._riscos_loadaddr = (self._riscos_loadaddr & 0xFFF000FF) | (self.directory_filetype_internal << 8)
-                else:
-                    self._riscos_loadaddr = (self._riscos_loadaddr & 0xFFF000FF) | (filetype << 8)
+                    loadaddr_filetype = self.directory_filetype_internal
+                self._riscos_loadaddr = (self._riscos_loadaddr & 0xFFF000FF) | (loadaddr_filetype << 8)
             else:
                 # The load address is untyped, so we need to build a new one from the datetime
                 dt = tuple_to_datetime(self.riscos_date_time)
@@ -1294,14 +1292,40 @@ class ZipInfoRISCOS(zipfile.ZipInfo):
         Python 3.
         """
         st = os.stat(filename)
-        isdir = stat.S_ISDIR(st.st_mode)
-        mtime = time.gmtime(st.st_mtime)
-        date_time = mtime[0:6]
         if arcname is None:
             arcname = filename
-        arcname = os.path.normpath(os.path.splitdrive(arcname)[1])
-        while arcname[0] in (os.sep, os.altsep):
-            arcname = arcname[1:]
+        return cls._from_stat(st, arcname, nfs_encoding)
+
+    @classmethod
+    def from_direntry(cls, entry, arcname=None, nfs_encoding=False):
+        """
+        Read the ZipInfo parameters from a directory entry returned by os.scandir().
+
+        The entry caches its stat information once it has been read, but on POSIX systems
+        reading it still requires a stat call for each object.
+        """
+        # Follow symlinks, so that the result is the same as from_file, which uses os.stat.
+        st = entry.stat()
+        if arcname is None:
+            arcname = entry.path
+        return cls._from_stat(st, arcname, nfs_encoding)
+
+    @classmethod
+    def _from_stat(cls, st, arcname, nfs_encoding):
+        """
+        Construct the ZipInfo parameters from the stat information for a file.
+        """
+        isdir = (st.st_mode & stat_mode_type_mask) == stat_mode_directory
+        mtime = time.gmtime(st.st_mtime)
+        date_time = mtime[0:6]
+        arcname = os.path.splitdrive(arcname)[1]
+        # Only normalise the path when it contains components which need it, as this
+        # is comparatively expensive and most names are already normalised.
+        components = arcname.split(os.sep)
+        if not arcname or '.' in components or '..' in components or '' in components[1:] or \
+           (os.altsep and os.altsep in arcname):
+            arcname = os.path.normpath(arcname)
+        arcname = arcname.lstrip(os.sep + (os.altsep or ''))
 
         if isdir:
             arcname += '/'
@@ -11,14 +11,15 @@ Type:   Unit test
 # pylint: disable=no-self-use
 
 import os
+import shutil
 import sys
+import tempfile
 import unittest
 import zipfile
 
-import nose
+import pytest
 
-
-rozipinfo = None
+import rozipinfo
 
 
 # Constants
@@ -44,30 +45,28 @@ ATTR_RW = 0x33
 ATTR_R = 0x11
 ATTR_W = 0x22
 
-EXTRA_TEST_FILE = bytes(bytearray.fromhex('41 43 14 00 41 52 43 30 '    # Header + length + ARC0
-                                          '58 fd ff ff '                # Load address
-                                          '60 ff e0 6b '                # Exec address
-                                          '33 00 00 00 '                # Attributes
-                                          '00 00 00 00'))               # Zero
-
-EXTRA_TEST_FILE_LOADEXEC = bytes(bytearray.fromhex('41 43 14 00 41 52 43 30 '    # Header + length + ARC0
-                                                   '78 56 34 12 '                # Load address
-                                                   '21 43 65 87 '                # Exec address
-                                                   '33 00 00 00 '                # Attributes
-                                                   '00 00 00 00'))               # Zero
+# Unix modes, as held in the top of the external attributes
+UNIX_EXEC = 0o111 << 16     # --x--x--x
+UNIX_W = 0o222 << 16        # -w--w--w-
+UNIX_R = 0o444 << 16        # r--r--r--
+UNIX_RW = 0o666 << 16       # rw-rw-rw-
+UNIX_R_ONLY = 0o400 << 16   # r--------
+
+EXTRA_TEST_FILE = bytes.fromhex('41 43 14 00 41 52 43 30 '     # Header + length + ARC0
+                                '58 fd ff ff '                  # Load address
+                                '60 ff e0 6b '                  # Exec address
+                                '33 00 00 00 '                  # Attributes
+                                '00 00 00 00')                  # Zero
+
+EXTRA_TEST_FILE_LOADEXEC = bytes.fromhex('41 43 14 00 41 52 43 30 '    # Header + length + ARC0
+                                         '78 56 34 12 '                 # Load address
+                                         '21 43 65 87 '                 # Exec address
+                                         '33 00 00 00 '                 # Attributes
+                                         '00 00 00 00')                 # Zero
 
 # UT Is interesting in that it seems to be generated with missing fields in the CD when created with infozip
-EXTRA_UT_TESTDATE = bytes(bytearray.fromhex('55 54 05 00 '              # Header + length
-                                            '03 18 5b b1 5e'))          # flags (3), 4 bytes of unix epoch timestamp
-
-
-# Ensure that the Coverage module is configured to instrument the package we
-# care about (and to play nice with other people)
-if os.environ.get('NOSE_WITH_COVERAGE') or '--with-coverage' in sys.argv:
-    package = os.environ.get('NOSE_COVER_PACKAGE', '').split(',')
-    package = set(pkg for pkg in package if pkg != '')
-    package.add('rozipinfo')
-    os.environ['NOSE_COVER_PACKAGE'] = ",".join(sorted(package))
+EXTRA_UT_TESTDATE = bytes.fromhex('55 54 05 00 '           # Header + length
+                                  '03 18 5b b1 5e')         # flags (3), 4 bytes of unix epoch timestamp
 
 
 def build_loadexec(loadaddr, execaddr, filetype=None):
@@ -78,530 +77,411 @@ def build_loadexec(loadaddr, execaddr, filetype=None):
     return (loadaddr, execaddr)
 
 
-class BaseTestCase(unittest.TestCase):
+# Expected load/exec pairs for the common cases
+LOADEXEC_BASE_DATA = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE)
+LOADEXEC_BASE_TEXT = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT)
+LOADEXEC_BASE_ZIP = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_ZIP)
+LOADEXEC_BASE_SPRITE = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE)
+LOADEXEC_BASE_DIRECTORY = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DIRECTORY)
+LOADEXEC_TEST_DATA = build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE)
+# Load/exec given by the NFS encodings ',fffff93a,c7524201' (note the +1 centisecond) and ',12345678,87654321'
+LOADEXEC_NFS_SPRITE = build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE + 1, filetype=FILETYPE_SPRITE)
+LOADEXEC_NFS_UNTYPED = build_loadexec(0x12345678, 0x87654321)
+
+# Original ZipInfo objects to compare against; these are only read by the tests
+BASELINE_EMPTY = zipfile.ZipInfo()
+BASELINE_MYFILE = zipfile.ZipInfo(filename='myfile')
+BASELINE_DATETIME = zipfile.ZipInfo(date_time=TESTDATE)
+BASELINE_DATED = zipfile.ZipInfo(filename='myfile', date_time=TESTDATE)
+BASELINE_DIR = zipfile.ZipInfo(filename='directory/')
+
+
+# The RISC OS properties which check_riscos can compare, and how to read them
+RISCOS_CHECKS = (
+        ('filename', lambda zi: zi.riscos_filename),
+        ('filetype', lambda zi: zi.riscos_filetype),
+        ('loadexec', lambda zi: (zi.riscos_loadaddr, zi.riscos_execaddr)),
+        ('attr', lambda zi: zi.riscos_attr),
+        ('objtype', lambda zi: zi.riscos_objtype),
+        ('date_time', lambda zi: zi.riscos_date_time),
+    )
+
+
+def format_riscos(values):
+    """
+    Format RISC OS properties for a failure message, giving the numeric properties in hex.
+    """
+    parts = []
+    for name in sorted(values):
+        value = values[name]
+        if name in ('filetype', 'attr') and isinstance(value, int):
+            value = '%#x' % (value,)
+        elif name == 'loadexec' and all(isinstance(part, int) for part in value):
+            value = '(0x%08x, 0x%08x)' % value
+        else:
+            value = repr(value)
+        parts.append('{}={}'.format(name, value))
+    return ', '.join(parts)
+
+
+def check_riscos(zi, **kwargs):
+    """
+    Check that the RISC OS properties of an object have the expected values.
 
-    longMessage = True
+    Only the properties which are given (and not None) are checked; they are compared
+    in one go so that any failure reports all the differences.
+    """
+    expected = {}
+    actual = {}
+    for name, getter in RISCOS_CHECKS:
+        value = kwargs.pop(name, None)
+        if value is not None:
+            expected[name] = value
+            actual[name] = getter(zi)
+    assert not kwargs, 'Unknown properties to check: {}'.format(', '.join(sorted(kwargs)))
 
-    def checkRISCOS(self, zi, filename=None, loadexec=None, filetype=None, objtype=None, attr=None, date_time=None):
-        if filename is not None:
-            self.assertEqual(zi.riscos_filename, filename)
+    # The message is only formatted if the comparison fails
+    assert actual == expected, 'RISC OS properties {} != expected {}'.format(format_riscos(actual),
+                                                                             format_riscos(expected))
 
-        if filetype is not None:
-            self.assertEqual(hex(zi.riscos_filetype), hex(filetype))
 
-        if loadexec is not None:
-            self.assertEqual((hex(zi.riscos_loadaddr), hex(zi.riscos_execaddr)), (hex(loadexec[0]), hex(loadexec[1])))
+def snapshot(zi):
+    """
+    Collect the standard ZipInfo properties, so that they can be compared in one go.
 
-        if attr is not None:
-            self.assertEqual(zi.riscos_attr, attr)
-            self.assertEqual(zi.riscos_attr, attr)
+    Only the properties which ZipInfoRISCOS overrides or updates are collected; fields
+    it never touches, such as the comment, are left out.
+    """
+    return (zi.filename, zi.date_time, zi.extra, zi.internal_attr, zi.external_attr)
 
-        if objtype is not None:
-            self.assertEqual(zi.riscos_objtype, objtype)
 
-        if date_time is not None:
-            self.assertEqual(zi.riscos_date_time, date_time)
+def check_original(zi, original):
+    """
+    Check that an object has the same standard ZipInfo properties as the original.
+    """
+    assert zi is not None
+    assert snapshot(zi) == snapshot(original)
+
+
+# Archive created on RISC OS, shared by the tests which read real entries
+ARCHIVE_RO_FILENAME = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'testdata', 'testdir-ro.zip')
+archive_ro = None
+archive_ro_infolist = None
+
+
+def setUpModule():  # pylint: disable=invalid-name
+    global archive_ro, archive_ro_infolist  # pylint: disable=global-statement
+    archive_ro = zipfile.ZipFile(ARCHIVE_RO_FILENAME, 'r')
+    archive_ro_infolist = archive_ro.infolist()
+
+
+def tearDownModule():  # pylint: disable=invalid-name
+    archive_ro.close()
+
+
+# Construction parameters, the original ZipInfo to compare with (if any), and the RISC OS properties
+# expected from them
+CONSTRUCT_CASES = [
+        # Construction with the standard ZipInfo parameters
+        pytest.param(dict(), BASELINE_EMPTY,
+                     dict(filename=b'NoName', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='11_001_empty'),
+        pytest.param(dict(filename='myfile'), BASELINE_MYFILE,
+                     dict(filename=b'myfile', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='11_002_filename'),
+        pytest.param(dict(date_time=TESTDATE), BASELINE_DATETIME,
+                     dict(filename=b'NoName', loadexec=LOADEXEC_TEST_DATA, filetype=FILETYPE_DATA),
+                     id='11_003_datetime'),
+        pytest.param(dict(zipinfo=BASELINE_DATED), BASELINE_DATED,
+                     dict(filename=b'myfile', loadexec=LOADEXEC_TEST_DATA, filetype=FILETYPE_DATA),
+                     id='11_004_zipinfo'),
+        pytest.param(dict(filename='directory/'), BASELINE_DIR,
+                     dict(filename=b'directory', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='11_010_directory'),
+
+        # Mapping of the filename's extension and path to filetypes
+        pytest.param(dict(filename='file.zip'), None,
+                     dict(filename=b'file/zip', loadexec=LOADEXEC_BASE_ZIP, filetype=FILETYPE_ZIP),
+                     id='20_001_extension_mapping_zip'),
+        pytest.param(dict(filename='file.txt'), None,
+                     dict(filename=b'file/txt', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='20_002_extension_mapping_txt'),
+        pytest.param(dict(filename='c/source'), None,
+                     dict(filename=b'c.source', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='20_050_directory_mapping_c'),
+        pytest.param(dict(filename='myapp/c/source'), None,
+                     dict(filename=b'myapp.c.source', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='20_051_directory_mapping_c_subdir'),
+        pytest.param(dict(filename='s/assembly'), None,
+                     dict(filename=b's.assembly', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='20_052_directory_mapping_s'),
+        pytest.param(dict(filename='this/that/myapp/s/assembly'), None,
+                     dict(filename=b'this.that.myapp.s.assembly', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='20_053_directory_mapping_s_deep'),
+        pytest.param(dict(filename='nots/assembly'), None,
+                     dict(filename=b'nots.assembly', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='20_060_directory_mapping_not_s'),
+
+        # Using the NFS Encoding to set filetypes and load/exec
+        pytest.param(dict(filename='file,ff9'), None,
+                     dict(filename=b'file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='21_001_filetype_suffix'),
+        pytest.param(dict(filename='file,fft'), None,
+                     dict(filename=b'file,fft', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='21_002_filetype_suffix_invalid'),
+        pytest.param(dict(filename='c/file,ff9'), None,
+                     dict(filename=b'c.file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='21_003_filetype_suffix_before_pathname'),
+        # Note intentional + 1 to check it's real
+        pytest.param(dict(filename='c/file,fffff93a,c7524201'), None,
+                     dict(filename=b'c.file',
+                          loadexec=LOADEXEC_NFS_SPRITE,
+                          filetype=FILETYPE_SPRITE),
+                     id='21_004_loadexec_suffix'),
+        pytest.param(dict(filename='c/file,12345678,87654321'), None,
+                     dict(filename=b'c.file', loadexec=LOADEXEC_NFS_UNTYPED, filetype=-1),
+                     id='21_005_loadexec_suffix_untyped'),
+
+        # WITHOUT the NFS Encoding to set filetypes and load/exec
+        pytest.param(dict(filename='file,ff9', nfs_encoding=False), None,
+                     dict(filename=b'file,ff9', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='22_001_filetype_suffix'),
+        pytest.param(dict(filename='file,fft', nfs_encoding=False), None,
+                     dict(filename=b'file,fft', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='22_002_filetype_suffix_invalid'),
+        pytest.param(dict(filename='c/file,ff9', nfs_encoding=False), None,
+                     dict(filename=b'c.file,ff9', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='22_003_filetype_suffix_before_pathname'),
+        pytest.param(dict(filename='c/file,fffff93a,c7524201', nfs_encoding=False), None,
+                     dict(filename=b'c.file,fffff93a,c7524201', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='22_004_loadexec_suffix'),
+        pytest.param(dict(filename='c/file,12345678,87654321', nfs_encoding=False), None,
+                     dict(filename=b'c.file,12345678,87654321', loadexec=LOADEXEC_BASE_TEXT, filetype=FILETYPE_TEXT),
+                     id='22_005_loadexec_suffix_untyped'),
+    ]
+
+# Filenames whose NFS encoding is toggled after construction, and the properties expected afterwards
+TOGGLE_CASES = [
+        # Starting with the NFS Encoding, and then turning it off
+        pytest.param('file,ff9', True, 'file',
+                     dict(filename=b'file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='21_101_toggle_filetype_suffix'),
+        pytest.param('file,fft', True, 'file,fft',
+                     dict(filename=b'file,fft', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='21_102_toggle_filetype_suffix_invalid'),
+        pytest.param('c/file,ff9', True, 'c/file',
+                     dict(filename=b'c.file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='21_103_toggle_filetype_suffix_before_pathname'),
+        # Note intentional + 1 to check it's real
+        pytest.param('c/file,fffff93a,c7524201', True, 'c/file',
+                     dict(filename=b'c.file',
+                          loadexec=LOADEXEC_NFS_SPRITE,
+                          filetype=FILETYPE_SPRITE),
+                     id='21_104_toggle_loadexec_suffix'),
+        pytest.param('c/file,12345678,87654321', True, 'c/file',
+                     dict(filename=b'c.file', loadexec=LOADEXEC_NFS_UNTYPED, filetype=-1),
+                     id='21_105_toggle_loadexec_suffix_untyped'),
+
+        # Starting without the NFS Encoding, and then turning it on
+        pytest.param('file,ff9', False, 'file,ff9',
+                     dict(filename=b'file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='22_101_toggle_filetype_suffix'),
+        pytest.param('file,fft', False, 'file,fft',
+                     dict(filename=b'file,fft', loadexec=LOADEXEC_BASE_DATA, filetype=FILETYPE_DATA),
+                     id='22_102_toggle_filetype_suffix_invalid'),
+        pytest.param('c/file,ff9', False, 'c/file,ff9',
+                     dict(filename=b'c.file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='22_103_toggle_filetype_suffix_before_pathname'),
+        # The centiseconds aren't preserved.
+        pytest.param('c/file,fffff93a,c7524201', False, 'c/file,ff9',
+                     dict(filename=b'c.file', loadexec=LOADEXEC_BASE_SPRITE, filetype=FILETYPE_SPRITE),
+                     id='22_104_toggle_loadexec_suffix'),
+        pytest.param('c/file,12345678,87654321', False, 'c/file,12345678,87654321',
+                     dict(filename=b'c.file', loadexec=LOADEXEC_NFS_UNTYPED, filetype=-1),
+                     id='22_105_toggle_loadexec_suffix_untyped'),
+    ]
+
+
+class Test11ConstructRISCOSFeatures(object):
+    """
+    Properties of newly constructed objects.
 
+    The standard properties are compared with the original ZipInfo, and the RISC OS properties
+    check the filename mappings and NFS Encoding.
+    """
 
-class Test01Import(BaseTestCase):
+    @pytest.mark.parametrize('kwargs, original, expected', CONSTRUCT_CASES)
+    def test_construct(self, kwargs, original, expected):
+        zi = rozipinfo.ZipInfoRISCOS(**kwargs)
+        assert zi is not None
+        if original is not None:
+            check_original(zi, original)
+        if 'filename' in kwargs:
+            assert zi.filename == kwargs['filename']
+        check_riscos(zi, objtype=OBJTYPE_FILE, attr=ATTR_RW, **expected)
+        assert zi.extra == b'', 'Should be no extra field for constructed objects'
 
-    def test_000_import(self):
-        global rozipinfo  # pylint: disable=global-statement
-        import rozipinfo as rozipinfo  # pylint: disable=redefined-outer-name
 
+class Test21FilenameNFSEncodingToggle(object):
+    """
+    Changing whether the NFS Encoding is used after construction.
+    """
 
-class Test10ConstructOriginalFeatures(BaseTestCase):
+    @pytest.mark.parametrize('filename, nfs_encoding, unix_filename, expected', TOGGLE_CASES)
+    def test_toggle(self, filename, nfs_encoding, unix_filename, expected):
+        zi = rozipinfo.ZipInfoRISCOS(filename=filename, nfs_encoding=nfs_encoding)
+        zi.nfs_encoding = not nfs_encoding
+        assert zi.filename == unix_filename
+        check_riscos(zi, objtype=OBJTYPE_FILE, attr=ATTR_RW, **expected)
+        if zi.nfs_encoding:
+            assert zi.extra == b'', 'Should be no extra field when using NFS encoding'
 
-    def test_001_empty(self):
-        # Check that it works as when given nothing
-        original = zipfile.ZipInfo()
-        zi = rozipinfo.ZipInfoRISCOS()
-        self.assertIsNotNone(zi)
-        self.assertEqual(zi.filename, original.filename)
-        self.assertEqual(zi.date_time, original.date_time)
-        self.assertEqual(zi.extra, original.extra)
-        self.assertEqual(zi.comment, original.comment)
-        self.assertEqual(zi.internal_attr, original.internal_attr)
-        self.assertEqual(zi.external_attr, original.external_attr)
-
-    def test_002_filename(self):
-        # Check that it works when given a filename
-        original = zipfile.ZipInfo(filename='myfile')
-        zi = rozipinfo.ZipInfoRISCOS(filename='myfile')
-        self.assertIsNotNone(zi)
-        self.assertEqual(zi.filename, original.filename)
-        self.assertEqual(zi.date_time, original.date_time)
-        self.assertEqual(zi.extra, original.extra)
-        self.assertEqual(zi.comment, original.comment)
-        self.assertEqual(zi.internal_attr, original.internal_attr)
-        self.assertEqual(zi.external_attr, original.external_attr)
-
-    def test_003_datetime(self):
-        # Check that it works when given a datetime
-        original = zipfile.ZipInfo(date_time=TESTDATE)
-        zi = rozipinfo.ZipInfoRISCOS(date_time=TESTDATE)
-        self.assertIsNotNone(zi)
-        self.assertEqual(zi.filename, original.filename)
-        self.assertEqual(zi.date_time, original.date_time)
-        self.assertEqual(zi.extra, original.extra)
-        self.assertEqual(zi.comment, original.comment)
-        self.assertEqual(zi.internal_attr, original.internal_attr)
-        self.assertEqual(zi.external_attr, original.external_attr)
-
-    def test_004_zipinfo(self):
-        # Check that it works when given a zipinfo
-        original = zipfile.ZipInfo(filename='myfile', date_time=TESTDATE)
-        zi = rozipinfo.ZipInfoRISCOS(zipinfo=original)
-        self.assertIsNotNone(zi)
-        self.assertEqual(zi.filename, original.filename)
-        self.assertEqual(zi.date_time, original.date_time)
-        self.assertEqual(zi.extra, original.extra)
-        self.assertEqual(zi.comment, original.comment)
-        self.assertEqual(zi.internal_attr, original.internal_attr)
-        self.assertEqual(zi.external_attr, original.external_attr)
-
-    def test_010_directory(self):
-        # Check that it works when given a filename
-        original = zipfile.ZipInfo(filename='directory/')
-        zi = rozipinfo.ZipInfoRISCOS(filename='directory/')
-        self.assertIsNotNone(zi)
-        self.assertEqual(zi.filename, original.filename)
-        self.assertEqual(zi.date_time, original.date_time)
-        self.assertEqual(zi.extra, original.extra)
-        self.assertEqual(zi.comment, original.comment)
-        self.assertEqual(zi.internal_attr, original.internal_attr)
-        self.assertEqual(zi.external_attr, original.external_attr)
-
-
-class Test11ConstructRISCOSFeatures(BaseTestCase):
 
-    def test_001_empty(self):
-        # Check that it works as when given nothing
-        original = zipfile.ZipInfo()
-        zi = rozipinfo.ZipInfoRISCOS()
-        self.assertIsNotNone(zi)
-        self.checkRISCOS(zi,
-                         filename=original.filename.encode(zi.filename_encoding_name),
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_002_filename(self):
-        # Check that it works when given a filename
-        original = zipfile.ZipInfo(filename='myfile')
-        zi = rozipinfo.ZipInfoRISCOS(filename='myfile')
-        self.checkRISCOS(zi,
-                         filename=original.filename.encode(zi.filename_encoding_name),
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_003_datetime(self):
-        # Check that it works when given a datetime
-        original = zipfile.ZipInfo(date_time=TESTDATE)
-        zi = rozipinfo.ZipInfoRISCOS(date_time=TESTDATE)
-        self.checkRISCOS(zi,
-                         filename=original.filename.encode(zi.filename_encoding_name),
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_004_zipinfo(self):
-        # Check that it works when given a zipinfo
-        original = zipfile.ZipInfo(filename='myfile', date_time=TESTDATE)
-        zi = rozipinfo.ZipInfoRISCOS(zipinfo=original)
-        self.checkRISCOS(zi,
-                         filename=original.filename.encode(zi.filename_encoding_name),
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_010_directory(self):
-        # Check that it works when given a filename
-        original = zipfile.ZipInfo(filename='directory/')
-        zi = rozipinfo.ZipInfoRISCOS(filename='directory/')
-        self.checkRISCOS(zi,
-                         filename=b'directory',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-
-class Test20FilenamePathFiletype(BaseTestCase):
-    """
-    Effects of changing the filename.
-    """
-
-    def test_001_extension_mapping_zip(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file.zip')
-        self.checkRISCOS(zi,
-                         filename=b'file/zip',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_ZIP),
-                         filetype=FILETYPE_ZIP,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_002_extension_mapping_txt(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file.txt')
-        self.checkRISCOS(zi,
-                         filename=b'file/txt',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_050_directory_mapping_c(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/source')
-        self.checkRISCOS(zi,
-                         filename=b'c.source',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_051_directory_mapping_c_subdir(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='myapp/c/source')
-        self.checkRISCOS(zi,
-                         filename=b'myapp.c.source',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_052_directory_mapping_s(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='s/assembly')
-        self.checkRISCOS(zi,
-                         filename=b's.assembly',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_053_directory_mapping_s_deep(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='this/that/myapp/s/assembly')
-        self.checkRISCOS(zi,
-                         filename=b'this.that.myapp.s.assembly',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_060_directory_mapping_not_s(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='nots/assembly')
-        self.checkRISCOS(zi,
-                         filename=b'nots.assembly',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-
-class Test21FilenameNFSEncoding(BaseTestCase):
-    """
-    Using the NFS Encoding to set filetypes and load/exec
-    """
-
-    def test_001_filetype_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,ff9')
-        self.assertEqual(zi.filename, 'file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_002_filetype_suffix_invalid(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,fft')
-        self.assertEqual(zi.filename, 'file,fft')
-        self.checkRISCOS(zi,
-                         filename=b'file,fft',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_003_filetype_suffix_before_pathname(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,ff9')
-        self.assertEqual(zi.filename, 'c/file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_004_loadexec_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,fffff93a,c7524201') # Note intentional + 1 to check it's real
-        self.assertEqual(zi.filename, 'c/file,fffff93a,c7524201')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE + 1, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_005_loadexec_suffix_untyped(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,12345678,87654321')
-        self.assertEqual(zi.filename, 'c/file,12345678,87654321')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(0x12345678, 0x87654321),
-                         filetype=-1,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    #### Toggling tests, where we start with an NFS encoding, and then turn it off.
-    def test_101_toggle_filetype_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,ff9')
-        zi.nfs_encoding = False
-        self.assertEqual(zi.filename, 'file')
-        self.checkRISCOS(zi,
-                         filename=b'file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_102_toggle_filetype_suffix_invalid(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,fft')
-        zi.nfs_encoding = False
-        self.assertEqual(zi.filename, 'file,fft')
-        self.checkRISCOS(zi,
-                         filename=b'file,fft',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_103_toggle_filetype_suffix_before_pathname(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,ff9')
-        zi.nfs_encoding = False
-        self.assertEqual(zi.filename, 'c/file')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_104_toggle_loadexec_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,fffff93a,c7524201') # Note intentional + 1 to check it's real
-        zi.nfs_encoding = False
-        self.assertEqual(zi.filename, 'c/file')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE + 1, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_105_toggle_loadexec_suffix_untyped(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,12345678,87654321')
-        zi.nfs_encoding = False
-        self.assertEqual(zi.filename, 'c/file')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(0x12345678, 0x87654321),
-                         filetype=-1,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-
-class Test22FilenameNFSEncodingDisabled(BaseTestCase):
-    """
-    WITHOUT the NFS Encoding to set filetypes and load/exec
-    """
-
-    def test_001_filetype_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,ff9', nfs_encoding=False)
-        self.assertEqual(zi.filename, 'file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'file,ff9',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_002_filetype_suffix_invalid(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,fft', nfs_encoding=False)
-        self.assertEqual(zi.filename, 'file,fft')
-        self.checkRISCOS(zi,
-                         filename=b'file,fft',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_003_filetype_suffix_before_pathname(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,ff9', nfs_encoding=False)
-        self.assertEqual(zi.filename, 'c/file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'c.file,ff9',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_004_loadexec_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,fffff93a,c7524201', nfs_encoding=False) # Note intentional + 1 (to match enabled case)
-        self.assertEqual(zi.filename, 'c/file,fffff93a,c7524201')
-        self.checkRISCOS(zi,
-                         filename=b'c.file,fffff93a,c7524201',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_005_loadexec_suffix_untyped(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,12345678,87654321', nfs_encoding=False)
-        self.assertEqual(zi.filename, 'c/file,12345678,87654321')
-        self.checkRISCOS(zi,
-                         filename=b'c.file,12345678,87654321',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-
-    def test_101_toggle_filetype_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,ff9', nfs_encoding=False)
-        zi.nfs_encoding = True
-        self.assertEqual(zi.filename, 'file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_102_toggle_filetype_suffix_invalid(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='file,fft', nfs_encoding=False)
-        zi.nfs_encoding = True
-        self.assertEqual(zi.filename, 'file,fft')
-        self.checkRISCOS(zi,
-                         filename=b'file,fft',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_103_toggle_filetype_suffix_before_pathname(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,ff9', nfs_encoding=False)
-        zi.nfs_encoding = True
-        self.assertEqual(zi.filename, 'c/file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_104_toggle_loadexec_suffix(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,fffff93a,c7524201', nfs_encoding=False) # Note intentional + 1 (to match enabled case)
-        zi.nfs_encoding = True
-        self.assertEqual(zi.filename, 'c/file,ff9')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         # The centiseconds aren't preserved.
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-    def test_105_toggle_loadexec_suffix_untyped(self):
-        zi = rozipinfo.ZipInfoRISCOS(filename='c/file,12345678,87654321', nfs_encoding=False)
-        zi.nfs_encoding = True
-        self.assertEqual(zi.filename, 'c/file,12345678,87654321')
-        self.checkRISCOS(zi,
-                         filename=b'c.file',
-                         loadexec=build_loadexec(0x12345678, 0x87654321),
-                         filetype=-1,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
-        self.assertEqual(zi.extra, b'', 'Should be no extra field when using NFS encoding')
-
-
-class Test23FilenameBadCharacters(BaseTestCase):
+class Test23FilenameBadCharacters(object):
     """
     Using bad characters in the unix filename.
     """
 
     def test_001_rooted(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='/myfile')
-        self.assertEqual(zi.filename, '/myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Rooting should be stripped')
+        assert zi.filename == '/myfile'
+        assert zi.riscos_filename == b'myfile', 'Rooting should be stripped'
 
     def test_002_root_relative(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='/../myfile')
-        self.assertEqual(zi.filename, '/../myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Relative at the root should be stripped')
+        assert zi.filename == '/../myfile'
+        assert zi.riscos_filename == b'myfile', 'Relative at the root should be stripped'
 
     def test_003_rooted_multiply(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='//myfile')
-        self.assertEqual(zi.filename, '//myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Rooting should be stripped')
+        assert zi.filename == '//myfile'
+        assert zi.riscos_filename == b'myfile', 'Rooting should be stripped'
 
     def test_004_root(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='/')
-        self.assertEqual(zi.filename, '/')
-        self.assertEqual(zi.riscos_filename, b'root', 'Rooting should be stripped')
+        assert zi.filename == '/'
+        assert zi.riscos_filename == b'root', 'Rooting should be stripped'
 
     def test_010_wd_relative(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='../myfile')
-        self.assertEqual(zi.filename, '../myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Relative at the WD should be stripped')
+        assert zi.filename == '../myfile'
+        assert zi.riscos_filename == b'myfile', 'Relative at the WD should be stripped'
 
     def test_011_wd_relative_multiple(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='../../myfile')
-        self.assertEqual(zi.filename, '../../myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Relative at the WD should be stripped')
+        assert zi.filename == '../../myfile'
+        assert zi.riscos_filename == b'myfile', 'Relative at the WD should be stripped'
 
     def test_012_wd(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='.')
-        self.assertEqual(zi.filename, '.')
-        self.assertEqual(zi.riscos_filename, b'root', 'Current at the WD should be stripped')
+        assert zi.filename == '.'
+        assert zi.riscos_filename == b'root', 'Current at the WD should be stripped'
 
     def test_013_relative(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='..')
-        self.assertEqual(zi.filename, '..')
-        self.assertEqual(zi.riscos_filename, b'root', 'Relative at the WD should be stripped')
+        assert zi.filename == '..'
+        assert zi.riscos_filename == b'root', 'Relative at the WD should be stripped'
 
     def test_020_relative_internal_suffix(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='mydir/..')
-        self.assertEqual(zi.filename, 'mydir/..')
-        self.assertEqual(zi.riscos_filename, b'root', 'Relative within path should be stripped')
+        assert zi.filename == 'mydir/..'
+        assert zi.riscos_filename == b'root', 'Relative within path should be stripped'
 
     def test_021_relative_internal_suffix_dir(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='mydir/../')
-        self.assertEqual(zi.filename, 'mydir/../')
-        self.assertEqual(zi.riscos_filename, b'root', 'Relative within path should be stripped')
+        assert zi.filename == 'mydir/../'
+        assert zi.riscos_filename == b'root', 'Relative within path should be stripped'
 
     def test_022_relative_internal_file(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='this/mydir/../myfile')
-        self.assertEqual(zi.filename, 'this/mydir/../myfile')
-        self.assertEqual(zi.riscos_filename, b'this.myfile', 'Relative within path should be stripped')
+        assert zi.filename == 'this/mydir/../myfile'
+        assert zi.riscos_filename == b'this.myfile', 'Relative within path should be stripped'
 
     def test_023_relative_internal_file_multiply(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='this/mydir/../../myfile')
-        self.assertEqual(zi.filename, 'this/mydir/../../myfile')
-        self.assertEqual(zi.riscos_filename, b'myfile', 'Relative within path should be stripped')
+        assert zi.filename == 'this/mydir/../../myfile'
+        assert zi.riscos_filename == b'myfile', 'Relative within path should be stripped'
 
 
-class Test40BaseProperties(BaseTestCase):
+class Test24RISCOSFilenameBadCharacters(object):
+    """
+    Using bad characters in the RISC OS filename.
+    """
+
+    def test_001_system_variable(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'<Obey$Dir>.file'
+        assert zi.riscos_filename == b'(Obey$Dir).file', 'System variables should be made safe'
+
+    def test_002_quotes(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'"file"'
+        assert zi.riscos_filename == b"'file'", 'Quotes should be replaced'
+
+    def test_003_anchored(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'$.dir.file'
+        assert zi.riscos_filename == b'dir.file', 'Anchors should be stripped'
+
+    def test_004_wildcards(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'file*?'
+        assert zi.riscos_filename == b'file(star)(q)', 'Wildcards should be replaced'
+
+    def test_005_disc(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'disc:file'
+        assert zi.riscos_filename == b'disc--file', 'Disc names should be made safe'
+
+    def test_006_plain(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'dir.file/txt'
+        assert zi.riscos_filename == b'dir.file/txt', 'Plain names should be unchanged'
+
+    def test_007_separators(self):
+        zi = rozipinfo.ZipInfoRISCOS()
+        zi.riscos_filename = b'.dir.file.'
+        assert zi.riscos_filename == b'dir.file', 'Leading and trailing separators should be stripped'
+
+
+class CountingZipInfoRISCOS(rozipinfo.ZipInfoRISCOS):
+    """
+    ZipInfoRISCOS which counts the number of times that the NFS encoding is parsed.
+    """
+    parses = 0
+
+    @classmethod
+    def extract_nfs_encoding(cls, name):
+        cls.parses += 1
+        return super(CountingZipInfoRISCOS, cls).extract_nfs_encoding(name)
+
+
+class Test25FilenameNFSEncodingCache(object):
+    """
+    Parsing of the NFS Encoding from the filename is only performed once per filename.
+    """
+
+    def setup_method(self, method):  # pylint: disable=unused-argument
+        CountingZipInfoRISCOS.parses = 0
+
+    def test_001_all_properties(self):
+        zi = CountingZipInfoRISCOS(filename='c/file,fffff93a,c7524201')
+        check_riscos(zi,
+                     filename=b'c.file',
+                     loadexec=LOADEXEC_NFS_SPRITE,
+                     filetype=FILETYPE_SPRITE)
+        assert CountingZipInfoRISCOS.parses == 1
+
+    def test_002_filename_changed(self):
+        zi = CountingZipInfoRISCOS(filename='file,ff9')
+        assert zi.riscos_filetype == FILETYPE_SPRITE
+        zi.filename = 'file,fff'
+        assert zi.riscos_filetype == FILETYPE_TEXT
+        assert zi.riscos_filename == b'file'
+        assert CountingZipInfoRISCOS.parses == 2
+
+
+class Test40BaseProperties(object):
     """
     Setting base properties
     """
@@ -610,95 +490,95 @@ class Test40BaseProperties(BaseTestCase):
     def test_001_filename(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.filename = "another-name"
-        self.checkRISCOS(zi,
-                         filename=b'another-name',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        check_riscos(zi,
+                     filename=b'another-name',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_020_datetime(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.date_time = TESTDATE
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_TEST_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_040_internalattr_text(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.internal_attr |= 1
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_TEXT,
+                     filetype=FILETYPE_TEXT,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_060_externalattr_directory(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.external_attr |= 16
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DIRECTORY,
-                         objtype=OBJTYPE_DIRECTORY,
-                         attr=ATTR_RW)
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DIRECTORY,
+                     objtype=OBJTYPE_DIRECTORY,
+                     attr=ATTR_RW)
 
     def test_061_externalattr_readonly(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.external_attr |= 1
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_R)
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_R)
 
     def test_062_externalattr_unixattr_r_r_r_(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o444 << 16  # r--r--r--
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_R)
+        zi.external_attr = UNIX_R  # r--r--r--
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_R)
 
     def test_063_externalattr_unixattr__w_w_w(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o222 << 16  # -w--w--w-
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_W)
+        zi.external_attr = UNIX_W  # -w--w--w-
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_W)
 
     def test_064_externalattr_unixattr_rwrwrw(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o666 << 16  # rw-rw-rw-
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        zi.external_attr = UNIX_RW  # rw-rw-rw-
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_065_externalattr_unixattr_r_____(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o400 << 16  # r--------
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_R)
+        zi.external_attr = UNIX_R_ONLY  # r--------
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_R)
 
 
-class Test60RISCOSProperties(BaseTestCase):
+class Test60RISCOSProperties(object):
     """
     Set RISC OS properties
     """
@@ -706,76 +586,76 @@ class Test60RISCOSProperties(BaseTestCase):
     def test_001_filename(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_filename = b"myfile"
-        self.assertEqual(zi.filename, 'myfile')
-        self.checkRISCOS(zi,
-                         filename=b'myfile',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert zi.filename == 'myfile'
+        check_riscos(zi,
+                     filename=b'myfile',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_020_filetype(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_filetype = FILETYPE_SPRITE
-        self.assertEqual(zi.filename, 'NoName,ff9')
-        self.assertFalse(bool(zi.internal_attr & 1), "Check for internal text flag")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_SPRITE),
-                         filetype=FILETYPE_SPRITE,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert zi.filename == 'NoName,ff9'
+        assert not (zi.internal_attr & 1), "Check for internal text flag"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_SPRITE,
+                     filetype=FILETYPE_SPRITE,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_021_filetype_text(self):
         # Text filetype should set the text bit, so not need to have the explicit NFS extension.
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_filetype = FILETYPE_TEXT
-        self.assertEqual(zi.filename, 'NoName')
-        self.assertTrue(bool(zi.internal_attr & 1), "Check for internal text flag")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_TEXT),
-                         filetype=FILETYPE_TEXT,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert zi.filename == 'NoName'
+        assert zi.internal_attr & 1, "Check for internal text flag"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_TEXT,
+                     filetype=FILETYPE_TEXT,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_022_filetype_default(self):
         # Data filetype should clear the text bit, so not need to have the explicit NFS extension.
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_filetype = FILETYPE_DATA
-        self.assertEqual(zi.filename, 'NoName')
-        self.assertFalse(bool(zi.internal_attr & 1), "Check for internal text flag")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert zi.filename == 'NoName'
+        assert not (zi.internal_attr & 1), "Check for internal text flag"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_023_filetype_directory(self):
         # Making it a directory should change the object type and the filename
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_filetype = FILETYPE_DIRECTORY
-        self.assertEqual(zi.filename, 'NoName/')
-        self.assertTrue(bool(zi.external_attr & 16), "Check for msdos directory bit")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DIRECTORY,
-                         objtype=OBJTYPE_DIRECTORY,
-                         attr=ATTR_RW)
+        assert zi.filename == 'NoName/'
+        assert zi.external_attr & 16, "Check for msdos directory bit"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DIRECTORY,
+                     objtype=OBJTYPE_DIRECTORY,
+                     attr=ATTR_RW)
 
     def test_040_directory(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_objtype = OBJTYPE_DIRECTORY
-        self.assertEqual(zi.filename, 'NoName/')
-        self.assertTrue(bool(zi.external_attr & 16), "Check for msdos directory bit")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DIRECTORY),
-                         filetype=FILETYPE_DIRECTORY,
-                         objtype=OBJTYPE_DIRECTORY,
-                         attr=ATTR_RW)
+        assert zi.filename == 'NoName/'
+        assert zi.external_attr & 16, "Check for msdos directory bit"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DIRECTORY,
+                     filetype=FILETYPE_DIRECTORY,
+                     objtype=OBJTYPE_DIRECTORY,
+                     attr=ATTR_RW)
 
     def test_041_directory_to_file(self):
         # Was a directory, became a file
@@ -785,174 +665,276 @@ class Test60RISCOSProperties(BaseTestCase):
         # So we will force the attribute bit to be set.
         zi.external_attr |= 16
         zi.riscos_objtype = OBJTYPE_FILE
-        self.assertEqual(zi.filename, 'mydir')
-        self.assertFalse(bool(zi.external_attr & 16), "Check for msdos directory bit")
-        self.checkRISCOS(zi,
-                         filename=b'mydir',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE, filetype=FILETYPE_DATA),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert zi.filename == 'mydir'
+        assert not (zi.external_attr & 16), "Check for msdos directory bit"
+        check_riscos(zi,
+                     filename=b'mydir',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_060_attributes_rw_nounix(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_attr = ATTR_RW
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertEqual(mode, 0, "Check for unix mode still unset")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert mode == 0, "Check for unix mode still unset"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_061_attributes_r_nounix(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_attr = ATTR_R
-        self.assertTrue(bool(zi.external_attr & 1), "Check for msdos read only bit set")
+        assert zi.external_attr & 1, "Check for msdos read only bit set"
         mode = zi.external_attr >> 16
-        self.assertEqual(mode, 0, "Check for unix mode still unset")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_R)
+        assert mode == 0, "Check for unix mode still unset"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_R)
 
     def test_062_attributes_w_nounix(self):
         zi = rozipinfo.ZipInfoRISCOS()
         zi.riscos_attr = ATTR_W
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertEqual(mode, 0, "Check for unix mode still unset")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_W)
+        assert mode == 0, "Check for unix mode still unset"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_W)
 
     def test_070_attributes_rw_withunix(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16
+        zi.external_attr = UNIX_EXEC
         zi.riscos_attr = ATTR_RW
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool((mode & 0o222) and mode & (0o444)), "Check for unix mode rw")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert (mode & 0o222) and mode & (0o444), "Check for unix mode rw"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_071_attributes_r_withunix(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16
+        zi.external_attr = UNIX_EXEC
         zi.riscos_attr = ATTR_R
-        self.assertTrue(bool(zi.external_attr & 1), "Check for msdos read only bit set")
+        assert zi.external_attr & 1, "Check for msdos read only bit set"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool(mode & (0o444)), "Check for unix mode r-")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_R)
+        assert mode & (0o444), "Check for unix mode r-"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_R)
 
     def test_072_attributes_w_withunix(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_EXEC  # Force the external_attr for unix mode to be used
         zi.riscos_attr = ATTR_W
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool(mode & (0o222)), "Check for unix mode -w")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_BASEDATE, EXECADDR_BASEDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_W)
+        assert mode & (0o222), "Check for unix mode -w"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_BASE_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_W)
 
 
-class Test80ExtraFieldReading(BaseTestCase):
+class Test80ExtraFieldReading(object):
     """
     Tests of the extra field - reading existing extra fields
     """
 
     def test_001_reading(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_EXEC  # Force the external_attr for unix mode to be used
         zi.extra = EXTRA_TEST_FILE
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool((mode & 0o222) and mode & (0o444)), "Check for unix mode rw")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert (mode & 0o222) and mode & (0o444), "Check for unix mode rw"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_TEST_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_002_arc0_ut(self):
         # Check that we handle multiple fields - RISC OS first, then generic time
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_EXEC  # Force the external_attr for unix mode to be used
         zi.extra = EXTRA_TEST_FILE + EXTRA_UT_TESTDATE
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool((mode & 0o222) and mode & (0o444)), "Check for unix mode rw")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert (mode & 0o222) and mode & (0o444), "Check for unix mode rw"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_TEST_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
     def test_003_ut_arc0(self):
         # Check that we handle multiple fields - RISC OS first, then generic time
         zi = rozipinfo.ZipInfoRISCOS()
-        zi.external_attr = 0o111 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_EXEC  # Force the external_attr for unix mode to be used
         zi.extra = EXTRA_TEST_FILE + EXTRA_UT_TESTDATE
-        self.assertFalse(bool(zi.external_attr & 1), "Check for msdos read only bit clear")
+        assert not (zi.external_attr & 1), "Check for msdos read only bit clear"
         mode = zi.external_attr >> 16
-        self.assertTrue(bool((mode & 0o222) and mode & (0o444)), "Check for unix mode rw")
-        self.checkRISCOS(zi,
-                         filename=b'NoName',
-                         loadexec=build_loadexec(LOADADDR_TESTDATE, EXECADDR_TESTDATE),
-                         filetype=FILETYPE_DATA,
-                         objtype=OBJTYPE_FILE,
-                         attr=ATTR_RW)
+        assert (mode & 0o222) and mode & (0o444), "Check for unix mode rw"
+        check_riscos(zi,
+                     filename=b'NoName',
+                     loadexec=LOADEXEC_TEST_DATA,
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=ATTR_RW)
 
 
-class Test81ExtraFieldWriting(BaseTestCase):
+class Test81ExtraFieldWriting(object):
     """
     Tests of the extra field - writing extra fields
     """
 
     def test_001_empty(self):
         zi = rozipinfo.ZipInfoRISCOS()
-        self.assertEqual(zi.extra, b'')
+        assert zi.extra == b''
 
     def test_002_from_nfs_encoding_filetype(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='file,ffd')
-        zi.external_attr = 0o666 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_RW  # Force the external_attr for unix mode to be used
         zi.date_time = TESTDATE
         zi.nfs_encoding = False
-        self.assertEqual(zi.extra, EXTRA_TEST_FILE)
+        assert zi.extra == EXTRA_TEST_FILE
 
     def test_003_from_nfs_encoding_loadexec(self):
         zi = rozipinfo.ZipInfoRISCOS(filename='file,12345678,87654321')
-        zi.external_attr = 0o666 << 16  # Force the external_attr for unix mode to be used
+        zi.external_attr = UNIX_RW  # Force the external_attr for unix mode to be used
         zi.date_time = TESTDATE
         zi.nfs_encoding = False
-        self.assertEqual(zi.extra, EXTRA_TEST_FILE_LOADEXEC)
+        assert zi.extra == EXTRA_TEST_FILE_LOADEXEC
+
+
+class Test85ArchiveReading(object):
+    """
+    Tests of entries read from an archive created on RISC OS
+    """
+
+    def test_001_directory(self):
+        zi = rozipinfo.ZipInfoRISCOS(zipinfo=archive_ro_infolist[0])
+        assert zi.filename == 'testdir/'
+        check_riscos(zi,
+                     filename=b'testdir',
+                     loadexec=(0xfffffd58, 0x7224b81c),
+                     filetype=FILETYPE_DIRECTORY,
+                     objtype=OBJTYPE_DIRECTORY,
+                     attr=0x03,
+                     date_time=(2020, 5, 17, 16, 21, 51, 0))
+
+    def test_002_data(self):
+        zi = rozipinfo.ZipInfoRISCOS(zipinfo=archive_ro_infolist[1])
+        assert zi.filename == 'testdir/data'
+        check_riscos(zi,
+                     filename=b'testdir.data',
+                     loadexec=(0xfffffd58, 0x7224ab38),
+                     filetype=FILETYPE_DATA,
+                     objtype=OBJTYPE_FILE,
+                     attr=0x03,
+                     date_time=(2020, 5, 17, 16, 21, 18, 0))
+
+    def test_003_typed(self):
+        zi = rozipinfo.ZipInfoRISCOS(zipinfo=archive_ro_infolist[2])
+        assert zi.filename == 'testdir/MiniZip'
+        check_riscos(zi,
+                     filename=b'testdir.MiniZip',
+                     loadexec=(0xfffff858, 0x72248acc),
+                     filetype=0xff8,
+                     objtype=OBJTYPE_FILE,
+                     attr=0x03,
+                     date_time=(2020, 5, 17, 16, 19, 55, 0))
+
+
+class Test90FromFilesystem(unittest.TestCase):
+    """
+    Tests of construction from objects on the filesystem
+    """
+
+    def setUp(self):
+        self.tmpdir = tempfile.mkdtemp()
+        with open(os.path.join(self.tmpdir, 'file.txt'), 'wb') as fh:
+            fh.write(b'content')
+        os.mkdir(os.path.join(self.tmpdir, 'subdir'))
+
+    def tearDown(self):
+        shutil.rmtree(self.tmpdir)
+
+    def test_001_file(self):
+        zi = rozipinfo.ZipInfoRISCOS.from_file(os.path.join(self.tmpdir, 'file.txt'), arcname='file.txt')
+        self.assertEqual(zi.filename, 'file.txt')
+        self.assertEqual(zi.file_size, 7)
+        check_riscos(zi,
+                     filename=b'file/txt',
+                     filetype=FILETYPE_TEXT,
+                     objtype=OBJTYPE_FILE)
+
+    def test_002_directory(self):
+        zi = rozipinfo.ZipInfoRISCOS.from_file(os.path.join(self.tmpdir, 'subdir'), arcname='subdir')
+        self.assertEqual(zi.filename, 'subdir/')
+        self.assertEqual(zi.file_size, 0)
+        check_riscos(zi,
+                     filename=b'subdir',
+                     filetype=FILETYPE_DIRECTORY,
+                     objtype=OBJTYPE_DIRECTORY)
+
+    def check_arcname(self, arcname, expected):
+        zi = rozipinfo.ZipInfoRISCOS.from_file(os.path.join(self.tmpdir, 'file.txt'), arcname=arcname)
+        self.assertEqual(zi.filename, expected)
+
+    def test_003_arcname_rooted(self):
+        self.check_arcname('/abs/file.txt', 'abs/file.txt')
+
+    def test_004_arcname_parent(self):
+        self.check_arcname('./a/../file.txt', 'file.txt')
+
+    def test_005_arcname_double_separator(self):
+        self.check_arcname('dir//file.txt', 'dir/file.txt')
+
+    def test_006_arcname_current(self):
+        self.check_arcname('a/./b', 'a/b')
+
+    def test_007_arcname_root(self):
+        self.check_arcname('/', '')
+
+    def test_010_direntry(self):
+        for entry in os.scandir(self.tmpdir):
+            arcname = os.path.relpath(entry.path, self.tmpdir)
+            zi = rozipinfo.ZipInfoRISCOS.from_direntry(entry, arcname=arcname)
+            original = rozipinfo.ZipInfoRISCOS.from_file(entry.path, arcname=arcname)
+            self.assertEqual(zi.filename, original.filename)
+            self.assertEqual(zi.date_time, original.date_time)
+            self.assertEqual(zi.file_size, original.file_size)
+            self.assertEqual(zi.external_attr, original.external_attr)
+            check_riscos(zi,
+                         filename=original.riscos_filename,
+                         filetype=original.riscos_filetype,
+                         objtype=original.riscos_objtype)
 
 
 if __name__ == '__main__':
-    __name__ = os.path.basename(sys.argv[0][:-3])  # pylint: disable=redefined-builtin
-    env = os.environ
-    env['NOSE_WITH_XUNIT'] = '1'
-    env['NOSE_VERBOSE'] = '1'
-    exit(nose.runmodule(env=env))
+    # The pytest options are configured in pyproject.toml.
+    exit(pytest.main([__file__] + sys.argv[1:]))
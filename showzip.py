@@ -3,8 +3,6 @@
 Small script to just print a list of what's in a zip archive using the ZipInfoRISCOS object.
 """
 
-from __future__ import print_function
-
 import argparse
 import re
 import sys
@@ -13,76 +11,121 @@ import zipfile
 import rozipinfo
 
 
-escapable_re = re.compile(br'[\x00-\x1f\x7f-\xff]')
+# Bytes in RISC OS filenames which must be escaped when presented
+escapable_re = re.compile(br'[\x00-\x1f\\\x7f-\xff]')
+# Presentation of each byte value, indexed by the byte
+riscos_escapes = tuple('\\x%02x' % (c,) if c < 0x20 or c >= 0x7f else
+                       '\\\\' if c == 0x5c else
+                       chr(c) for c in range(256))
 
 
 def present_unicode(name):
     """
     Presentation format for the Unicode native filenames
     """
-    if sys.version_info.major == 2:
-        name = name.encode('utf-8')
-        value = "'" + name.replace("'", "\\'") + "'"
-        return value
-    else:
-        return "'" + name.replace("'", "\\'") + "'"
+    return "'" + name.replace("'", "\\'") + "'"
 
 
 def present_riscos(name):
     """
     Presentation format for the RISC OS filenames
     """
-    name = name.replace(b'\\', b'\\\\')
-    value = escapable_re.sub(lambda s: b'\\x%02x' % (ord(s.group(0))), name)
-    if sys.version_info.major == 2:
-        return "'" + value.replace("'", "\\'") + "'"
+    if escapable_re.search(name):
+        # The backslash is escaped in the same pass as the control characters
+        value = ''.join([riscos_escapes[c] for c in name])
     else:
-        return "'" + value.decode('ascii') + "'"
+        # Nothing needs escaping, so the name is already plain ASCII
+        value = name.decode('ascii')
+    return "'" + value + "'"
+
 
 def riscos_type(value):
     return int(value, 16)
 
 
-parser = argparse.ArgumentParser()
-parser.add_argument('-v', '--verbose', action='store_true',
-                    help="Output more information during processing")
-parser.add_argument('-T', '--default-filetype', type=riscos_type,
-                    help="Default filetype to use for files without type")
-parser.add_argument('zipfile',
-                    help="Zip file to display contents of")
-
-options = parser.parse_args()
-
-zip_filename = options.zipfile
-
-
-cls_zipinfo = rozipinfo.ZipInfoRISCOS
-if options.default_filetype is not None:
-    class ZipInfoRISCOSCustom(rozipinfo.ZipInfoRISCOS):
-        pass
-    ZipInfoRISCOSCustom.default_filetype = options.default_filetype
-    cls_zipinfo = ZipInfoRISCOSCustom
-
-
-with zipfile.ZipFile(zip_filename, 'r') as zh:
-
-    for index, zi in enumerate(zh.infolist()):
-        zi = cls_zipinfo(zipinfo=zi)
-        print("File #{}".format(index))
-        if options.verbose:
-            print("  ZipInfo:               {!r}".format(zi))
-        print("  Unix filename:         {}".format(present_unicode(zi.filename)))
-        print("  Unix date/time:        {!r}".format(zi.date_time))
-        print("  MS DOS flags:          0x{:02x}".format(zi.external_attr & 0xFF))
-        print("  Unix mode:             0o{:05o}".format(zi.external_attr>>16))
-
-        print("  RISC OS filename:      {}".format(present_riscos(zi.riscos_filename)))
-        print("  RISC OS date/time:     {!r}".format(zi.riscos_date_time))
-        print("  RISC OS load/exec:     0x{:08x}/0x{:08x}".format(zi.riscos_loadaddr, zi.riscos_execaddr))
-        if zi.riscos_filetype == -1:
-            print("  RISC OS filetype:      unset")
-        else:
-            print("  RISC OS filetype:      0x{:03x}".format(zi.riscos_filetype))
-        print("  RISC OS attributes:    0x{:02x}".format(zi.riscos_attr))
-        print("  RISC OS object type:   {}".format(zi.riscos_objtype))
-        print("")
+# Number of entries to collect before writing them out
+entries_per_write = 100
+
+entry_header_template = "File #{index}\n"
+entry_verbose_template = "  ZipInfo:               {zipinfo!r}\n"
+entry_details_template = ("  Unix filename:         {unix_filename}\n"
+                          "  Unix date/time:        {unix_date_time!r}\n"
+                          "  MS DOS flags:          0x{msdos_flags:02x}\n"
+                          "  Unix mode:             0o{unix_mode:05o}\n"
+                          "  RISC OS filename:      {riscos_filename}\n"
+                          "  RISC OS date/time:     {riscos_date_time!r}\n"
+                          "  RISC OS load/exec:     0x{loadaddr:08x}/0x{execaddr:08x}\n"
+                          "  RISC OS filetype:      {filetype}\n"
+                          "  RISC OS attributes:    0x{attr:02x}\n"
+                          "  RISC OS object type:   {objtype}\n"
+                          "\n")
+
+# The templates for each entry, chosen once by whether the output is verbose
+entry_template = entry_header_template + entry_details_template
+entry_template_verbose = entry_header_template + entry_verbose_template + entry_details_template
+
+
+def format_entry(index, zi, template=entry_template):
+    """
+    Format the details of a single entry in the archive.
+
+    @param index:       Index of the entry within the archive
+    @param zi:          ZipInfoRISCOS object for the entry
+    @param template:    Template to format the entry with; entry_template_verbose
+                        includes the ZipInfo representation
+
+    @return: string describing the entry, as lines
+    """
+    filetype = zi.riscos_filetype
+    return template.format(index=index,
+                           zipinfo=zi,
+                           unix_filename=present_unicode(zi.filename),
+                           unix_date_time=zi.date_time,
+                           msdos_flags=zi.external_attr & 0xFF,
+                           unix_mode=zi.external_attr>>16,
+                           riscos_filename=present_riscos(zi.riscos_filename),
+                           riscos_date_time=zi.riscos_date_time,
+                           loadaddr=zi.riscos_loadaddr,
+                           execaddr=zi.riscos_execaddr,
+                           filetype='unset' if filetype == -1 else '0x{:03x}'.format(filetype),
+                           attr=zi.riscos_attr,
+                           objtype=zi.riscos_objtype)
+
+
+def main():
+    parser = argparse.ArgumentParser()
+    parser.add_argument('-v', '--verbose', action='store_true',
+                        help="Output more information during processing")
+    parser.add_argument('-T', '--default-filetype', type=riscos_type,
+                        help="Default filetype to use for files without type")
+    parser.add_argument('zipfile',
+                        help="Zip file to display contents of")
+
+    options = parser.parse_args()
+
+    zip_filename = options.zipfile
+
+    cls_zipinfo = rozipinfo.ZipInfoRISCOS
+    if options.default_filetype is not None:
+        class ZipInfoRISCOSCustom(rozipinfo.ZipInfoRISCOS):
+            pass
+        ZipInfoRISCOSCustom.default_filetype = options.default_filetype
+        cls_zipinfo = ZipInfoRISCOSCustom
+
+    write = sys.stdout.write
+    template = entry_template_verbose if options.verbose else entry_template
+    pending = []
+    try:
+        with zipfile.ZipFile(zip_filename, 'r') as zh:
+            for index, zi in enumerate(zh.infolist()):
+                pending.append(format_entry(index, cls_zipinfo(zipinfo=zi), template))
+                if len(pending) == entries_per_write:
+                    write(''.join(pending))
+                    del pending[:]
+    finally:
+        # Anything listed before a failure is still written out
+        write(''.join(pending))
+
+
+if __name__ == '__main__':
+    main()